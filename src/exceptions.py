@@ -4,3 +4,7 @@ class PrivateAccountException(Exception):
 
 class TemporarilyBannedException(Exception):
     """ Raised when Facebook Santa sees us being naughty """
+
+
+class LoginFailedException(Exception):
+    """ Raised when Facebook does not let us in with the given credentials """
@@ -0,0 +1,112 @@
+import logging
+from collections import namedtuple
+from io import BytesIO
+from pathlib import Path
+
+from PIL import Image, ImageChops
+
+_logger = logging.getLogger(__name__)
+
+# format: PNG (optimized) or WEBP (lossless), both keep every pixel for tesseract
+# max_width: downscale wider images to this width, None keeps the original size
+# trim: crop margins having the same color as the top left pixel
+ImageEncoding = namedtuple('ImageEncoding', ['format', 'max_width', 'trim'])
+
+DEFAULT_ENCODING = ImageEncoding("PNG", None, False)
+
+FORMAT_SUFFIXES = {"PNG": ".png", "WEBP": ".webp"}
+
+# Extensions of the screenshots we might find on disk, in any supported format
+IMAGE_PATTERNS = tuple(f"*{suffix}" for suffix in FORMAT_SUFFIXES.values())
+
+# Pixels of margin kept when trimming images read by tesseract,
+# it does poorly on text touching the border
+OCR_PADDING = 10
+
+
+def add_encoding_arguments(parser):
+    """
+    Adds image encoding options to an argparse parser, see encoding_from_args
+    """
+    parser.add_argument("--image-format", choices=["png", "webp"], default="png",
+                        help="Encode screenshots as optimized png or lossless webp")
+    parser.add_argument("--max-width", type=int, default=None,
+                        help="Downscale wider screenshots to this width, "
+                             "never applied to reaction boxes read by ocr.py")
+    parser.add_argument("--trim", action="store_true",
+                        help="Crop uniform margins of screenshots")
+
+
+def encoding_from_args(args):
+    """
+    :param args: parsed arguments of a parser passed to add_encoding_arguments
+    :return: an ImageEncoding
+    """
+    if args.max_width is not None and args.max_width <= 0:
+        raise ValueError(f"--max-width must be positive: {args.max_width}")
+    return ImageEncoding(args.image_format.upper(), args.max_width, args.trim)
+
+
+def suffix(encoding):
+    return FORMAT_SUFFIXES[encoding.format]
+
+
+def trim_margins(img, padding=0):
+    """
+    :param img: a PIL image
+    :param padding: pixels of margin to keep around the bounding box, where available
+    :return: img cropped to the bounding box of pixels differing from the top left pixel
+    """
+    background = Image.new(img.mode, img.size, img.getpixel((0, 0)))
+    bbox = ImageChops.difference(img.convert("RGB"), background.convert("RGB")).getbbox()
+    if not bbox:
+        # a uniform image, nothing to keep but also nothing to trim
+        return img
+    left, upper, right, lower = bbox
+    return img.crop((max(0, left - padding), max(0, upper - padding),
+                     min(img.width, right + padding), min(img.height, lower + padding)))
+
+
+def downscale(img, max_width):
+    if not max_width or img.width <= max_width:
+        return img
+    height = max(1, round(img.height * max_width / img.width))
+    return img.resize((max_width, height), Image.LANCZOS)
+
+
+def save_image(img, file_path, encoding=DEFAULT_ENCODING, lossless=False):
+    """
+    Saves img in the given encoding, replacing the suffix of file_path to match the format.
+
+    :param img: a PIL image
+    :param file_path: path to save file, relative to current working directory
+    :param encoding: an ImageEncoding
+    :param lossless: do not downscale and keep a margin when trimming,
+                     for images to be read by tesseract
+    :return: the path the image is saved in
+    """
+    if encoding.trim:
+        img = trim_margins(img, OCR_PADDING if lossless else 0)
+    if not lossless:
+        img = downscale(img, encoding.max_width)
+
+    file_path = Path(file_path).with_suffix(suffix(encoding))
+    if encoding.format == "WEBP":
+        img.save(file_path, format="WEBP", lossless=True, quality=100, method=4)
+    else:
+        img.save(file_path, format="PNG", optimize=True)
+    return file_path
+
+
+def save_png_bytes(png, file_path, encoding=DEFAULT_ENCODING, lossless=False):
+    """
+    Same as save_image for PNG bytes, such as a WebDriver screenshot.
+    """
+    return save_image(Image.open(BytesIO(png), formats=("PNG",)), file_path, encoding, lossless)
+
+
+def open_image(file_path):
+    """
+    Opens a screenshot saved by save_image, in any of the supported formats.
+    """
+    return Image.open(file_path, formats=tuple(FORMAT_SUFFIXES))
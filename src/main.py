@@ -13,8 +13,14 @@ from pathlib import Path
 from PIL import Image
 from selenium.common.exceptions import TimeoutException, InvalidArgumentException
 
-from exceptions import PrivateAccountException, TemporarilyBannedException
+from exceptions import LoginFailedException, PrivateAccountException, \
+    TemporarilyBannedException
+from images import FORMAT_SUFFIXES, add_encoding_arguments, encoding_from_args, open_image, \
+    save_image
+from ocr import InlineOcr
+from pacer import RequestPacer
 from parsers import PublicAccountScraper, PrivateAccountScraper
+from post_index import PostIndex
 
 # For Python to parse Turkish datetime properly (to handle localized month and day names)
 locale.setlocale(locale.LC_ALL, "tr_TR.UTF8")
@@ -61,6 +67,12 @@ def main():
     parser = argparse.ArgumentParser()
     parser.add_argument("--month",
                         help="Enter the year and month, for example, 202104")
+    add_encoding_arguments(parser)
+    parser.add_argument("--inline-ocr", action="store_true",
+                        help="Run tesseract on reaction boxes while scraping, instead of saving "
+                             "them for ocr.py. Only unparsable ones are saved in OCR")
+    parser.add_argument("--keep-ocr-images", action="store_true",
+                        help="With --inline-ocr, save all reaction boxes in OCR")
     args = parser.parse_args()
     try:
         my_month = args.month
@@ -69,6 +81,12 @@ def main():
         _logger.critical("Illegal month value: %s", val_err)
         return
 
+    try:
+        image_encoding = encoding_from_args(args)
+    except ValueError as val_err:
+        _logger.critical("Illegal encoding parameter: %s", val_err)
+        return
+
     email = os.getenv("EMAIL")
     password = os.getenv("PASSWORD")
     can_login = email and password
@@ -81,7 +99,8 @@ def main():
         _logger.info("WebDriver configured to run in headless mode.")
 
     try:
-        parse_urls(DateTarget(my_month, year_month), Credentials(email, password))
+        parse_urls(DateTarget(my_month, year_month), Credentials(email, password),
+                   image_encoding, args.inline_ocr, args.keep_ocr_images)
     except FileNotFoundError:
         _logger.critical("%s is missing, can not proceed.", URL_LIST_FILE_NAME)
         return
@@ -90,13 +109,18 @@ def main():
 URL_LIST_FILE_NAME = "urls.lst"
 
 
-def parse_urls(date_target, credentials):
+def parse_urls(date_target, credentials, image_encoding, inline_ocr=False,
+               keep_ocr_images=False):
     with open(Task.URL_HASH_CSV_PATH, "w", encoding="utf-8"):
         # just create or truncate
         pass
 
-    public_scraper = PublicAccountScraper()
-    private_scraper = PrivateAccountScraper(credentials)
+    # Both scrapers browse from the same IP, pace them together
+    pacer = RequestPacer()
+    public_scraper = PublicAccountScraper(image_encoding=image_encoding, pacer=pacer)
+    private_scraper = PrivateAccountScraper(credentials, image_encoding=image_encoding,
+                                            pacer=pacer)
+    ocr_stage = InlineOcr(image_encoding, keep_ocr_images) if inline_ocr else None
     try:
         with open(URL_LIST_FILE_NAME, "r", encoding="utf-8") as urls:
             for url in urls:
@@ -109,21 +133,32 @@ def parse_urls(date_target, credentials):
                     public_scraper.go_to(url)
                     scraper = public_scraper
                 except PrivateAccountException:
-                    # _logger.error(
-                    #     "%s requires private account parser. Not implemented yet. Ignoring...",
-                    #     url)
                     scraper = private_scraper
-                    scraper.go_to(url)
                 except TimeoutException:
-                    _logger.error("Request to %s, timed out. Ignoring...", task.scraper.url)
+                    _logger.error("Request to %s, timed out. Ignoring...", url)
                     continue
                 except InvalidArgumentException:
                     _logger.error("Can not parse invalid url: (%s)", url)
                     continue
 
-                task = Task(url, credentials, date_target, scraper)
+                if scraper is private_scraper:
+                    if not (credentials.email and credentials.password):
+                        _logger.error("%s requires login, credentials are not set. Ignoring...",
+                                      url)
+                        continue
+                    try:
+                        scraper.go_to(url)
+                    except TimeoutException:
+                        _logger.error("Request to %s, timed out. Ignoring...", url)
+                        continue
+                    except LoginFailedException as login_err:
+                        _logger.error("%s Ignoring %s", login_err, url)
+                        continue
+
+                task = Task(url, credentials, date_target, scraper, ocr_stage)
                 try:
-                    task.run()
+                    task.save_url_hash()
+                    run_task(task, pacer)
                 except TemporarilyBannedException:
                     _logger.critical("Facebook might have banned us :(")
                     return
@@ -132,20 +167,48 @@ def parse_urls(date_target, credentials):
     finally:
         public_scraper.close()
         private_scraper.close()
+        if ocr_stage:
+            ocr_stage.close()
+
+
+def run_task(task, pacer):
+    """
+    Runs the task, pausing and resuming it as long as the pacer is willing to wait for bans
+    to be lifted. Posts processed before a ban are skipped by the post index when resumed.
+    """
+    resume = False
+    while True:
+        try:
+            if resume:
+                task.resume()
+            task.run()
+            return
+        except TemporarilyBannedException:
+            if not pacer.pause_for_ban():
+                raise
+            resume = True
+
 
 class Task:
     """ The task executed for each account """
     URL_HASH_CSV_PATH = Path("url-md5.csv")
     OCR_DIR = Path('OCR')
     DOM_DIR = Path('DOM')
+    INDEX_DIR = Path('Index')
 
-    def __init__(self, url, credentials, date_target, scraper):
+    def __init__(self, url, credentials, date_target, scraper, ocr_stage=None):
+        """
+        :param ocr_stage: an InlineOcr to recognize reaction boxes while scraping,
+                          if None they are saved in OCR_DIR for ocr.py
+        """
         self.account_url = url
         self.url_hash = md5(url.encode("utf-8")).hexdigest()
         self.credentials = credentials
         self.date_target = date_target
         self.scraper = scraper
+        self.ocr_stage = ocr_stage
         self.post_images = []
+        self.post_index = None
         self.post_counter = 0
 
     def account_screenshot_filename(self):
@@ -166,36 +229,91 @@ class Task:
         """
         return self.DOM_DIR / f"{APP_NAME}_{self.url_hash}.csv"
 
+    def post_index_path(self):
+        """
+        :return: post index filename to be placed under ./Index
+        """
+        return self.INDEX_DIR / f"{APP_NAME}_{self.date_target.as_string}_{self.url_hash}.lst"
+
     def save_url_hash(self):
         with open(self.URL_HASH_CSV_PATH, "a+", encoding="utf-8") as dom_out:
             writer = csv.writer(dom_out)
             writer.writerow([self.account_url, self.url_hash])
 
+    def resume(self):
+        """
+        Goes back to the account page after a ban.
+        A public page asking us to login, or failing to login again, means we are still banned.
+        """
+        try:
+            self.scraper.go_to(self.account_url)
+        except (PrivateAccountException, LoginFailedException):
+            raise TemporarilyBannedException(f"Still banned: {self.account_url}") from None
+
     def run(self):
-        self.save_url_hash()
         self.scraper.full_page_screenshot(self.account_screenshot_filename())
         self.scraper.go_to_posts()
         self.scraper.scroll_down(self.date_target.as_date_time)
         self.OCR_DIR.mkdir(exist_ok=True)
         self.DOM_DIR.mkdir(exist_ok=True)
+        self.INDEX_DIR.mkdir(exist_ok=True)
+        self.post_index = PostIndex(self.post_index_path())
+        # Continue page order of a previous run, so its screenshots are not overwritten
+        self.post_counter = self.last_ocr_page_order()
         # We don't want page wallpaper to block post content as we scroll down and screenshot
         self.scraper.wallpaper_visibility(False)
-        self.scraper.filter_by(DateFilter(self.date_target.as_date_time),
-                               PostConsumer(self.scraper, self))
-        self.save_all_posts()
+        try:
+            self.scraper.filter_by(DateFilter(self.date_target.as_date_time),
+                                   PostConsumer(self.scraper, self))
+        finally:
+            if self.ocr_stage:
+                # Posts are indexed as their OCR results are saved
+                self.ocr_stage.flush()
+            # Posts consumed so far are already indexed, they would be missing from the image
+            # in the next runs otherwise
+            self.save_all_posts()
+
+    def last_ocr_page_order(self):
+        """
+        :return: the highest page order among the files under ./OCR for this month and account,
+                 whether they are images or tesseract outputs, 0 if there are none
+        """
+        prefix = f"{APP_NAME}_{self.date_target.as_string}_{self.url_hash}_"
+        orders = (file.stem[len(prefix):] for file in self.OCR_DIR.glob(f"{prefix}*"))
+        return max((int(order) for order in orders if order.isdigit()), default=0)
 
     def save_all_posts(self):
-        """Assembles post screenshots into a single image and saves it"""
-        src = [Image.open(BytesIO(img), formats=("PNG",)) for img in self.post_images]
-        if src:
-            width = src[0].width
-            height = sum(img.height for img in src)
-            dst = Image.new('RGB', (width, height))
-            height_cursor = 0
-            for img in src:
-                dst.paste(img, (0, height_cursor))
-                height_cursor += img.height
-            dst.save(self.all_posts_screenshot_filename())
+        """
+        Assembles post screenshots into a single image and saves it.
+        Posts of a previous run, if any, are kept at the top of the image.
+        """
+        if not self.post_images:
+            return
+
+        src = []
+        previous_paths = [Path(self.all_posts_screenshot_filename()).with_suffix(suffix)
+                          for suffix in FORMAT_SUFFIXES.values()]
+        previous_paths = [path for path in previous_paths if path.exists()]
+        for path in previous_paths:
+            with open_image(path) as previous:
+                src.append(previous.convert('RGB'))
+        src.extend(Image.open(BytesIO(img), formats=("PNG",)) for img in self.post_images)
+
+        width = max(img.width for img in src)
+        height = sum(img.height for img in src)
+        dst = Image.new('RGB', (width, height))
+        height_cursor = 0
+        for img in src:
+            dst.paste(img, (0, height_cursor))
+            height_cursor += img.height
+        saved_path = save_image(dst, self.all_posts_screenshot_filename(),
+                                self.scraper.image_encoding)
+        # Saved, a resumed run appends its posts to the image on disk
+        self.post_images = []
+        for path in previous_paths:
+            # encoding changed since the previous run
+            if path != saved_path:
+                path.unlink()
 
     def ocr_post_screenshot_path(self):
         """
@@ -216,15 +334,36 @@ class PostConsumer:
         self.task = task
 
     def accept(self, parsed_post, post_element):
+        if parsed_post.post_id in self.task.post_index:
+            _logger.debug("Post %s is already processed, skipping.", parsed_post.post_id)
+            return
+
+        # Screenshots first, a post failing half way leaves no DOM row behind
+        post_shot = self.scraper.element_screenshot_as_png(post_element)
+        if self.task.ocr_stage:
+            # The post is saved only after its OCR row, so a run stopped before tesseract
+            # is done processes it again instead of leaving a DOM row without an OCR row
+            self.task.ocr_stage.submit(self.scraper.post_reactions_screenshot_as_png(post_element),
+                                       self.task.ocr_post_screenshot_path(),
+                                       lambda: self.save(parsed_post, post_shot))
+        else:
+            self.scraper.post_reactions_screenshot(post_element,
+                                                   self.task.ocr_post_screenshot_path())
+            self.save(parsed_post, post_shot)
+
+    def save(self, parsed_post, post_shot):
+        """
+            Saves the DOM row of a post whose screenshots are taken, and marks it as processed.
+            :param parsed_post: ParsedPost of the post
+            :param post_shot: post screenshot as PNG bytes
+        """
         with open(self.task.dom_csv_path(), "a+", encoding="utf-8") as dom_out:
             writer = csv.writer(dom_out)
             writer.writerow([parsed_post.likes, parsed_post.comments, parsed_post.shares])
-
-        post_shot = self.scraper.element_screenshot_as_png(post_element)
         self.task.post_images.append(post_shot)
 
-        self.scraper.post_reactions_screenshot(post_element,
-                                               self.task.ocr_post_screenshot_path())
+        # Only now, so that a post failing half way is processed again in the next run
+        self.task.post_index.add(parsed_post.post_id)
 
     def __call__(self, parsed_post, post_element):
         self.accept(parsed_post, post_element)
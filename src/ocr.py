@@ -2,12 +2,17 @@ import csv
 import logging
 import re
 import sys
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from io import BytesIO
 from operator import attrgetter
 from pathlib import Path
 
 from PIL import Image
 from pytesseract import pytesseract
 
+from images import DEFAULT_ENCODING, IMAGE_PATTERNS, open_image, save_png_bytes
+
 _logger = logging.getLogger(__name__)
 
 OCR_DIR = Path("OCR")
@@ -16,28 +21,127 @@ OCR_DIR = Path("OCR")
 def main():
     # sorted to match DOM csv's for easier diffing
     for file in sorted(OCR_DIR.iterdir(), key=attrgetter('name')):
-        if file.match("*.png"):
-            tes_text = pytesseract.image_to_string(
-                Image.open(file, formats=("PNG",)), config='--psm 6', lang="tur")
-            _logger.debug("tesseract_output:'%s'", tes_text)
-
-            with open(file.with_suffix(".txt"), "w", encoding="utf-8") as txt:
-                txt.write(tes_text)
-
-            likes, comments, shares = (0, 0, 0)
+        # a .txt file next to the screenshot means it is OCRed in a previous run
+        if any(file.match(pattern) for pattern in IMAGE_PATTERNS) \
+                and not file.with_suffix(".txt").exists():
+            save_ocr_result(file, recognize(open_image(file)))
+
+
+def recognize(image):
+    """
+    :param image: a PIL image or PNG bytes of a reaction box
+    :return: tesseract's output
+    """
+    if isinstance(image, bytes):
+        image = Image.open(BytesIO(image), formats=("PNG",))
+    tes_text = pytesseract.image_to_string(image, config='--psm 6', lang="tur")
+    _logger.debug("tesseract_output:'%s'", tes_text)
+    return tes_text
+
+
+def save_ocr_result(image_path, tes_text):
+    """
+    Saves tesseract's output next to the image and appends the parsed statistics to the
+    account's .csv file in OCR_DIR.
+
+    :param image_path: path of the reaction box image, whether it is on disk or not
+    :param tes_text: tesseract's output for the image
+    :return: True if tesseract's output is parsed, False if zeroes are written instead
+    """
+    with open(image_path.with_suffix(".txt"), "w", encoding="utf-8") as txt:
+        txt.write(tes_text)
+
+    parsed = True
+    likes, comments, shares = (0, 0, 0)
+    try:
+        likes, comments, shares = TesseractOutputParser(tes_text).to_post_data()
+    except ValueError as val_err:
+        _logger.error("Error in %s tesseract's output: %s", image_path.name, val_err)
+        # write zeroes anyway, for easier diff comparison with DOM csvs
+        parsed = False
+
+    _logger.debug("Parsed tesseract output: likes:%s comments:%s shares:%s",
+                  likes, comments, shares)
+
+    parts = image_path.name.split("_")
+    with open(f"{OCR_DIR}/{parts[0]}_{parts[1]}_{parts[3]}.csv", "a+", encoding="utf-8") \
+            as tes_out:
+        csv.writer(tes_out).writerow((likes, comments, shares))
+    return parsed
+
+
+class InlineOcr:
+    """
+        Runs tesseract on reaction box screenshots in a process pool while scraping goes on,
+        instead of saving them for a later ocr.py run. Results are saved just like main does,
+        in the order the screenshots are submitted, so that .csv rows keep the page order.
+    """
+
+    def __init__(self, image_encoding=DEFAULT_ENCODING, keep_images=False, workers=None,
+                 max_pending=64):
+        """
+            :param image_encoding: an ImageEncoding for the reaction box images saved on disk
+            :param keep_images: save every reaction box image, not just the unparsable ones
+            :param workers: number of tesseract processes, number of CPUs if None
+            :param max_pending: submit blocks while this many screenshots wait for tesseract,
+                                so that a slow tesseract does not fill the memory
+        """
+        self.image_encoding = image_encoding
+        self.keep_images = keep_images
+        self.max_pending = max_pending
+        self.executor = ProcessPoolExecutor(max_workers=workers)
+        self.pending = deque()
+
+    def submit(self, png, image_path, on_saved=None):
+        """
+            :param png: reaction box screenshot as PNG bytes
+            :param image_path: path to save the image in, if it is kept
+            :param on_saved: called without arguments once the result's .csv row is saved
+        """
+        future = self.executor.submit(recognize, png)
+        if self.keep_images:
+            self._save_image(png, image_path)
+            # already on disk, no need to hold on to it
+            png = None
+        self.pending.append((png, image_path, future, on_saved))
+        self._save_results(block=len(self.pending) > self.max_pending)
+
+    def _save_results(self, block=False):
+        while self.pending and (block or self.pending[0][2].done()):
+            png, image_path, future, on_saved = self.pending.popleft()
             try:
-                likes, comments, shares = TesseractOutputParser(tes_text).to_post_data()
-            except ValueError as val_err:
-                _logger.error("Error in %s tesseract's output: %s", file.name, val_err)
-                # write zeroes anyway, for easier diff comparison with DOM csvs
-
-            _logger.debug("Parsed tesseract output: likes:%s comments:%s shares:%s",
-                          likes, comments, shares)
-
-            parts = file.name.split("_")
-            with open(f"{OCR_DIR}/{parts[0]}_{parts[1]}_{parts[3]}.csv", "a+", encoding="utf-8") \
-                    as tes_out:
-                csv.writer(tes_out).writerow((likes, comments, shares))
+                tes_text = future.result()
+            except Exception as ex:
+                # A row must be written anyway, or the following rows shift against DOM csvs.
+                # An empty output is saved as an unparsable one, zeros and all.
+                _logger.error("tesseract failed on %s: (%s) %s", image_path.name, type(ex), ex)
+                tes_text = ""
+            if not save_ocr_result(image_path, tes_text) and png:
+                # keep the image to see what went wrong
+                self._save_image(png, image_path)
+            if on_saved:
+                on_saved()
+            block = False
+
+    def _save_image(self, png, image_path):
+        # Read by tesseract, keep every pixel
+        save_png_bytes(png, image_path, self.image_encoding, lossless=True)
+
+    def flush(self):
+        """
+            Waits for all submitted screenshots to be recognized and saves their results.
+        """
+        while self.pending:
+            self._save_results(block=True)
+
+    def close(self):
+        """
+            Saves the pending results and stops the tesseract processes.
+        """
+        try:
+            self.flush()
+        finally:
+            self.executor.shutdown()
 
 
 class TesseractOutputParser:
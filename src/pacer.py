@@ -0,0 +1,95 @@
+import logging
+import random
+import time
+
+_logger = logging.getLogger(__name__)
+
+
+class RequestPacer:
+    """
+        Paces page loads and scrolls of all scrapers with a token bucket.
+
+        Its rate grows a little after each request without a login wall and is halved when one
+        appears, so we go as fast as Facebook lets us. When a ban is detected, pause_for_ban
+        waits with exponential backoff before the run resumes at the rate set by feedback.
+    """
+
+    def __init__(self, rate=0.2, min_rate=1 / 30, max_rate=1.0, rate_step=0.01, capacity=2,
+                 jitter=0.5, ban_pause=60, max_ban_pause=3600, max_bans=6,
+                 clock=time.monotonic, sleep=time.sleep):
+        """
+            :param rate: initial requests per second
+            :param min_rate: requests per second never go below this, however many login walls
+            :param max_rate: requests per second never go above this, however long we are fine
+            :param rate_step: requests per second added after each request without a login wall
+            :param capacity: number of requests that can be made in a burst after idling
+            :param jitter: a random delay up to this fraction of the request interval is added,
+                           to look less like a bot
+            :param ban_pause: seconds to pause after the first ban, doubled for each ban in a row
+            :param max_ban_pause: seconds to pause never go above this
+            :param max_bans: number of bans in a row, after which pause_for_ban gives up
+            :param clock: monotonic clock in seconds, for testing
+            :param sleep: sleep function in seconds, for testing
+        """
+        self.rate = rate
+        self.min_rate = min_rate
+        self.max_rate = max_rate
+        self.rate_step = rate_step
+        self.capacity = capacity
+        self.jitter = jitter
+        self.ban_pause = ban_pause
+        self.max_ban_pause = max_ban_pause
+        self.max_bans = max_bans
+        self.clock = clock
+        self.sleep = sleep
+        self.tokens = 1
+        self.last_refill = clock()
+        self.bans = 0
+
+    def acquire(self):
+        """
+            Blocks until a request can be made. Call before each page load or scroll.
+        """
+        self._refill()
+        if self.tokens < 1:
+            self.sleep((1 - self.tokens) / self.rate)
+            self._refill()
+        self.tokens -= 1
+        if self.jitter:
+            self.sleep(random.uniform(0, self.jitter / self.rate))
+
+    def _refill(self):
+        now = self.clock()
+        self.tokens = min(self.capacity, self.tokens + (now - self.last_refill) * self.rate)
+        self.last_refill = now
+
+    def feedback(self, login_wall):
+        """
+            Adapts the rate to the outcome of the last request.
+            :param login_wall: True if the last request hit a login wall
+        """
+        if login_wall:
+            self.rate = max(self.min_rate, self.rate / 2)
+            # no bursts right after a wall
+            self.tokens = min(self.tokens, 0)
+            _logger.info("Hit a login wall, slowing down to %.3f requests/s", self.rate)
+        else:
+            self.rate = min(self.max_rate, self.rate + self.rate_step)
+            self.bans = 0
+        _logger.debug("Pacing at %.3f requests/s", self.rate)
+
+    def pause_for_ban(self):
+        """
+            Waits for a ban to be lifted, longer for each ban in a row.
+            :return: False if we are banned too many times in a row to keep on, True otherwise
+        """
+        if self.bans >= self.max_bans:
+            return False
+        pause = min(self.max_ban_pause, self.ban_pause * 2 ** self.bans)
+        self.bans += 1
+        _logger.warning("Facebook might have banned us, pausing for %s seconds (%s/%s)",
+                        pause, self.bans, self.max_bans)
+        self.sleep(pause)
+        self.tokens = 0
+        self.last_refill = self.clock()
+        return True
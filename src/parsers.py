@@ -1,24 +1,27 @@
 import logging
-import random
+from abc import ABC, abstractmethod
+import re
 import time
 from collections import namedtuple
-from datetime import datetime
+from datetime import datetime, timedelta
 
 from selenium import webdriver
-from selenium.common.exceptions import NoSuchElementException
-from selenium.webdriver import ActionChains
+from selenium.common.exceptions import NoSuchElementException, TimeoutException
 from selenium.webdriver.common.by import By
 from selenium.webdriver.firefox.options import Options
 from selenium.webdriver.firefox.firefox_profile import FirefoxProfile
 from selenium.webdriver.support.wait import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 
-from exceptions import PrivateAccountException, TemporarilyBannedException
-from utils import xpath_endswith
+from exceptions import LoginFailedException, PrivateAccountException, \
+    TemporarilyBannedException
+from images import DEFAULT_ENCODING, save_png_bytes
+from pacer import RequestPacer
+from utils import post_id_from_permalink, xpath_endswith
 
 _logger = logging.getLogger(__name__)
 
-Post = namedtuple('Post', ['time', 'likes', 'comments', 'shares'])
+Post = namedtuple('Post', ['post_id', 'time', 'likes', 'comments', 'shares'])
 
 
 def browser_with_fresh_profile(user_agent=None):
@@ -42,7 +45,120 @@ def browser_with_fresh_profile(user_agent=None):
     return driver
 
 
-class PublicAccountScraper:
+class AccountScraper(ABC):
+    """
+        Browser helpers shared by the public and private account scrapers.
+    """
+
+    # Seconds to wait for more posts after a scroll, after which we are considered at the bottom
+    NEW_POSTS_TIMEOUT = 10
+
+    # Overridden by subclasses, selects all posts on a page
+    POST_XPATH = None
+
+    def __init__(self, browser=None, image_encoding=DEFAULT_ENCODING, pacer=None):
+        """
+            :param browser: a WebDriver, a fresh Firefox instance if None
+            :param image_encoding: an ImageEncoding for the screenshots saved in files
+            :param pacer: a RequestPacer, share one between scrapers using the same account/IP
+        """
+        self.browser = browser if browser else browser_with_fresh_profile()
+        self.image_encoding = image_encoding
+        self.pacer = pacer if pacer else RequestPacer()
+        self.url = ""
+
+    def close(self):
+        self.browser.close()
+
+    def _save_screenshot(self, png, file_path, lossless=False):
+        """
+            :param png: screenshot as png bytes
+            :param file_path: path to save file, its suffix is replaced to match image_encoding
+            :param lossless: do not downscale, for images to be read by tesseract
+        """
+        return save_png_bytes(png, file_path, self.image_encoding, lossless)
+
+    def _remove_element(self, element):
+        self.browser.execute_script(
+            """
+                var elem = arguments[0]
+                elem.parentNode.removeChild(elem)
+            """, element)
+
+    def _get(self, url):
+        self.pacer.acquire()
+        self.browser.get(url)
+
+    def _do_scroll(self, ):
+        # sometimes one scroll is not enough, for some reason
+        for _ in range(2):
+            self.pacer.acquire()
+            self.browser.execute_script(
+                "window.scrollTo(0, document.body.scrollHeight);")
+
+    def _post_count(self):
+        return len(self.browser.find_elements(By.XPATH, self.POST_XPATH))
+
+    def _wait_for_more_posts(self, post_count):
+        """
+            Waits for posts loaded by a scroll, instead of sleeping for a guessed duration.
+            :param post_count: number of posts before the scroll
+            :return: the new post count, or None if no more posts are loaded in NEW_POSTS_TIMEOUT
+        """
+        try:
+            return WebDriverWait(self.browser, timeout=self.NEW_POSTS_TIMEOUT).until(
+                lambda browser: self._more_posts_than(post_count))
+        except TimeoutException:
+            return None
+
+    def _more_posts_than(self, post_count):
+        """
+        :return: new post count if more posts are loaded, False otherwise
+        """
+        new_post_count = self._post_count()
+        return new_post_count if new_post_count > post_count else False
+
+    def _check_ban(self):
+        """
+            Call after each scroll, the pacer adapts to the outcome.
+            :raise TemporarilyBannedException: if the page wants us to login
+        """
+        login_wall = self._requires_login()
+        self.pacer.feedback(login_wall)
+        if login_wall:
+            raise TemporarilyBannedException(f"Login wall while scrolling: {self.url}")
+
+    @abstractmethod
+    def _requires_login(self):
+        """
+            :return: True if the current page wants us to login to see the account's posts
+        """
+
+    def _scroll_into_view(self, element):
+        # WORK AROUND
+        # Firefox driver does not move to element if not in viewport
+        # because they believe there should be a scroll standard, so we scroll ourselves
+        # see: https://github.com/mozilla/geckodriver/issues/776
+        self.browser.execute_script("arguments[0].scrollIntoView();", element)
+
+    @staticmethod
+    def _post_id(post_element, xpath):
+        try:
+            element = post_element.find_element(By.XPATH, xpath)
+        except NoSuchElementException:
+            return None
+        return post_id_from_permalink(element.get_attribute("href"))
+
+    @staticmethod
+    def _reaction_count(post_element, xpath):
+        try:
+            element = post_element.find_element(By.XPATH, xpath)
+        except NoSuchElementException:
+            return 0
+        return int(element.text.split(maxsplit=1)[0])
+
+
+class PublicAccountScraper(AccountScraper):
     """
         A parser that operates on public Facebook accounts using a Selenium-driven Firefox instance.
     """
@@ -83,6 +199,10 @@ class PublicAccountScraper:
 
     POST_DATE_ATTRIBUTE = "data-tooltip-content"
 
+    # Use on a post element.
+    # href of the selected element is the post's permalink, used as its identifier
+    POST_PERMALINK_XPATH = f"{POST_TIME_XPATH}/ancestor::a[1]"
+
     POST_DATE_FORMAT = '%d %B %Y %A, %H:%M'
 
     # Reaction Box is a form element in a Facebook post wrapper
@@ -130,12 +250,41 @@ class PublicAccountScraper:
     # To remove comments to help tesseract
     COMMENTS_HEADER_XPATH = ".//h6[@class='accessible_elem' and text()='Yorumlar']/parent::div"
 
-    def __init__(self, browser=None):
-        self.browser = browser if browser else browser_with_fresh_profile()
-        self.url = ""
+    # Removes every element in the way of post screenshots in a single round trip.
+    # arguments: page level xpaths to remove, post elements, reaction box xpath (use on a post),
+    # reaction box level xpaths to remove
+    # returns: number of removed elements
+    PREPARE_SCREENSHOTS_SCRIPT = """
+        var [pageXpaths, posts, reactionBoxXpath, reactionBoxXpaths] = arguments
+        function select(xpath, context) {
+            var result = document.evaluate(
+                xpath, context, null, XPathResult.ORDERED_NODE_SNAPSHOT_TYPE, null)
+            var nodes = []
+            for (var i = 0; i < result.snapshotLength; i++) {
+                nodes.push(result.snapshotItem(i))
+            }
+            return nodes
+        }
+        var removed = 0
+        function removeAll(xpath, context) {
+            select(xpath, context).forEach(function (elem) {
+                if (elem.parentNode) {
+                    elem.parentNode.removeChild(elem)
+                    removed++
+                }
+            })
+        }
+        pageXpaths.forEach(function (xpath) { removeAll(xpath, document) })
+        posts.forEach(function (post) {
+            select(reactionBoxXpath, post).forEach(function (reactionBox) {
+                reactionBoxXpaths.forEach(function (xpath) { removeAll(xpath, reactionBox) })
+            })
+        })
+        return removed
+    """
 
     def go_to(self, url):
-        self.browser.get(url)
+        self._get(url)
         self.url = url
         self.check_privacy()
 
@@ -161,16 +310,13 @@ class PublicAccountScraper:
         else:
             return False
 
-    def close(self):
-        self.browser.close()
-
     def full_page_screenshot(self, file_path):
         """
             Takes a full page screenshot and saves in file_path
             :param file_path: path to save file, relative to current working directory
         """
         self._delete_view_blocking_elements()
-        self.browser.get_full_page_screenshot_as_file(str(file_path))
+        self._save_screenshot(self.browser.get_full_page_screenshot_as_png(), file_path)
 
     def _delete_view_blocking_elements(self):
         self._delete_pagelet_banner()
@@ -182,13 +328,6 @@ class PublicAccountScraper:
         except NoSuchElementException:
             pass
 
-    def _remove_element(self, element):
-        self.browser.execute_script(
-            """
-                var elem = arguments[0]
-                elem.parentNode.removeChild(elem)
-            """, element)
-
     def go_to_posts(self):
         posts_link = self.browser.find_element(By.XPATH, self.SIDEBAR_POSTS_LINK_XPATH)
         self.go_to(posts_link.get_attribute('href'))
@@ -198,15 +337,19 @@ class PublicAccountScraper:
         Scroll down until we hit just before our target month.
         Going too far down, say for six months, might get us blocked/banned.
         """
-        last_post = None
+        post_count = self._post_count()
         while True:
             self._do_scroll()
             WebDriverWait(self.browser, timeout=30) \
                 .until(
                 EC.invisibility_of_element_located(
                     (By.XPATH, self.PROGRESSBAR_XPATH)))
-            if self._requires_login():
-                raise TemporarilyBannedException()
+            self._check_ban()
+
+            post_count = self._wait_for_more_posts(post_count)
+            if post_count is None:
+                # We hit bottom, no more posts
+                break
 
             lp_element = self.browser.find_element(By.XPATH,
                                                    f"({self.POST_XPATH})[last()]")
@@ -221,34 +364,15 @@ class PublicAccountScraper:
                 _logger.info("Passed target with %s", date_target)
                 break
 
-            # We hit bottom, no more posts
-            if last_post == lp:
-                break
-            last_post = lp
-
-    def _do_scroll(self, ):
-        # sometimes one scroll is not enough, for some reason
-        for _ in range(2):
-            self.browser.execute_script(
-                "window.scrollTo(0, document.body.scrollHeight);")
-            time.sleep(random.randint(3, 7))
-
     def _parse_post(self, post_element):
         post_time = post_element.find_element(
             By.XPATH, self.POST_TIME_XPATH).get_attribute(self.POST_DATE_ATTRIBUTE)
         post_time = datetime.strptime(post_time, self.POST_DATE_FORMAT)
+        post_id = self._post_id(post_element, self.POST_PERMALINK_XPATH)
         likes = self._reaction_count(post_element, self.LIKES_XPATH)
         comments = self._reaction_count(post_element, self.COMMENTS_XPATH)
         shares = self._reaction_count(post_element, self.SHARES_XPATH)
-        return Post(post_time, likes, comments, shares)
-
-    @staticmethod
-    def _reaction_count(post_element, xpath):
-        try:
-            element = post_element.find_element(By.XPATH, xpath)
-        except NoSuchElementException:
-            return 0
-        return int(element.text.split(maxsplit=1)[0])
+        return Post(post_id, post_time, likes, comments, shares)
 
     def filter_by(self, predicate, consumer):
         """
@@ -257,27 +381,47 @@ class PublicAccountScraper:
         :param consumer: A callback function to be called with parsed post and post element
                          matching the predicate.
         """
+        matches = []
+        seen_post_ids = set()
         post_elements = self.browser.find_elements(By.XPATH, self.POST_XPATH)
         for post_element in post_elements:
             post = self._parse_post(post_element)
+            # Pinned or shared posts may be inserted into the feed more than once
+            if post.post_id is not None:
+                if post.post_id in seen_post_ids:
+                    continue
+                seen_post_ids.add(post.post_id)
             if predicate(post):
-                consumer(post, post_element)
+                matches.append((post, post_element))
+
+        # Parse all posts before touching the page, then clean up once for all screenshots
+        if matches:
+            self.prepare_screenshots([post_element for _, post_element in matches])
+        for post, post_element in matches:
+            consumer(post, post_element)
+
+    def prepare_screenshots(self, post_elements):
+        """
+            Removes the banner, the floating reaction box and, in the reaction box of each
+            given post, the comments header, like icons and button icons in a single script.
+            Call once per page, after all posts are loaded and parsed.
+            :param post_elements: the dom elements of the posts to be screenshotted
+        """
+        removed = self.browser.execute_script(
+            self.PREPARE_SCREENSHOTS_SCRIPT,
+            [self.PAGELET_XPATH, self.FLOATING_REACTION_BOX_XPATH],
+            post_elements,
+            self.REACTION_BOX_XPATH,
+            [self.COMMENTS_HEADER_XPATH, self.LIKES_ICON_XPATH, self.REACTION_BOX_BUTTONS_XPATH])
+        _logger.debug("Removed %s elements before screenshots", removed)
 
     def element_screenshot_as_png(self, element):
-        self._delete_view_blocking_elements()
-        self._move_to_element(element)
+        """
+            Expects prepare_screenshots to be called on the page
+        """
+        self._scroll_into_view(element)
         return element.screenshot_as_png
 
-    def _move_to_element(self, element):
-        # WORK AROUND
-        # Firefox driver does not move to element if not in viewport
-        # because they believe there should be a scroll standard
-        # see: https://github.com/mozilla/geckodriver/issues/776
-        self.browser.execute_script("arguments[0].scrollIntoView();", element)
-        time.sleep(0.01)
-        ActionChains(self.browser).move_to_element(element).perform()
-        time.sleep(0.01)
-
     def wallpaper_visibility(self, visible):
         try:
             box = self.browser.find_element(By.XPATH, self.FLOATING_REACTION_BOX_XPATH)
@@ -293,70 +437,286 @@ class PublicAccountScraper:
     def post_reactions_screenshot(self, post_element, file_path):
         """
             Takes a screenshot of the given element after moving to it.
+            Expects prepare_screenshots to be called on the page.
             :param post_element: the dom element for the post
             :param file_path: path to save file, relative to current working directory
         """
-        self._delete_view_blocking_elements()
+        # Read by ocr.py, keep every pixel
+        self._save_screenshot(self.post_reactions_screenshot_as_png(post_element), file_path,
+                              lossless=True)
+
+    def post_reactions_screenshot_as_png(self, post_element):
+        """
+            Same as post_reactions_screenshot, returns the screenshot as PNG bytes.
+        """
         try:
             reaction_box = post_element.find_element(By.XPATH, self.REACTION_BOX_XPATH)
-            self._safe_clean_reaction_box(reaction_box)
         except NoSuchElementException:
             reaction_box = post_element
-        self._move_to_element(reaction_box)
-        reaction_box.screenshot(str(file_path))
-
-    def _safe_clean_reaction_box(self, reaction_box):
-        self._safe_remove_element(reaction_box, self.COMMENTS_HEADER_XPATH)
-        self._safe_remove_element(reaction_box, self.LIKES_ICON_XPATH)
-        # Three times (Like, Comment, Share)
-        self._safe_remove_element(reaction_box, self.REACTION_BOX_BUTTONS_XPATH)
-        self._safe_remove_element(reaction_box, self.REACTION_BOX_BUTTONS_XPATH)
-        self._safe_remove_element(reaction_box, self.REACTION_BOX_BUTTONS_XPATH)
-
-    def _safe_remove_element(self, ancestor, xpath):
-        try:
-            element = ancestor.find_element(By.XPATH, xpath)
-            self._remove_element(element)
-        except NoSuchElementException:
-            pass
+        self._scroll_into_view(reaction_box)
+        return reaction_box.screenshot_as_png
 
 
-class PrivateAccountScraper:
+class PrivateAccountScraper(AccountScraper):
+    """
+        A parser that operates on accounts requiring a logged-in session. Instead of scrolling
+        down the whole timeline, it uses the profile's post filter to jump to the target month,
+        so the work done is proportional to the number of posts in that month.
+    """
+
     FACEBOOK_HOME_URL = "https://www.facebook.com"
 
-    def __init__(self, credentials, browser=None):
+    # Login form fields on the home page, gone once we are logged in
+    LOGIN_EMAIL_NAME = "email"
+    LOGIN_PASSWORD_NAME = "pass"
+    LOGIN_BUTTON_NAME = "login"
+
+    # Seconds to wait for the login form to go away, after which login is considered failed
+    LOGIN_TIMEOUT = 30
+
+    # Month names as used in post dates and the post filter, independent of the locale
+    MONTH_NAMES = ("Ocak", "Şubat", "Mart", "Nisan", "Mayıs", "Haziran",
+                   "Temmuz", "Ağustos", "Eylül", "Ekim", "Kasım", "Aralık")
+
+    # Short post date, for example 12 Nisan 2020 or 12 Nisan (current year) or 12 Nisan 14:30
+    POST_DATE_REGEX = re.compile(r"\s*(\d{1,2})\s+(\w+)(?:\s+(\d{4})\b)?")
+
+    # Age of a recent post, for example 5 dk (minutes), 3 sa or 3 s (hours), 2 g (days)
+    POST_AGE_REGEX = re.compile(r"\s*(\d+)\s*(dk|sa|s|g)\b")
+
+    # Units of POST_AGE_REGEX as timedelta arguments
+    POST_AGE_UNITS = {"dk": "minutes", "sa": "hours", "s": "hours", "g": "days"}
+
+    # Dates of the most recent posts, relative to now, for example Dün saat 14:30
+    RELATIVE_DAYS = {"Şimdi": 0, "Az önce": 0, "Dün": 1}
+
+    # "Filters" button above the posts of a profile
+    POSTS_FILTER_BUTTON_XPATH = "//div[@role='main']" \
+                                "//div[@role='button' and .//span[text()='Filtreler']]"
+
+    # The dialog opened by the filter button
+    FILTER_DIALOG_XPATH = "//div[@role='dialog' and .//span[text()='Gönderi Filtreleri']]"
+
+    # Use on the filter dialog
+    FILTER_YEAR_XPATH = ".//div[@role='combobox' and .//span[text()='Yıl']]"
+
+    # Use on the filter dialog
+    FILTER_MONTH_XPATH = ".//div[@role='combobox' and .//span[text()='Ay']]"
+
+    # Combobox options are rendered in a listbox outside the dialog,
+    # format with the option text, for example 2021 or Nisan
+    FILTER_OPTION_XPATH = "//div[@role='listbox']" \
+                          "//div[@role='option' and .//span[text()='{}']]"
+
+    # Use on the filter dialog
+    FILTER_DONE_XPATH = ".//div[@role='button' and @aria-label='Bitti']"
+
+    # Top level posts in the feed have aria-posinset, comments are articles without it
+    POST_XPATH = "//div[@role='main']//div[@role='article' and @aria-posinset]"
+
+    # Use on a post element.
+    # Text of the selected element is the short post date, for example:
+    #   12 Nisan 2020 or 12 Nisan
+    POST_TIME_XPATH = ".//a[@role='link' and " \
+                      "(contains(@href, '/posts/') or contains(@href, 'fbid=') " \
+                      "or contains(@href, '/photos/') or contains(@href, '/videos/'))]"
+
+    # Use on a post element.
+    # Text of the selected element is the number of likes.
+    LIKES_XPATH = ".//span[text()='Tüm ifadeler:']" \
+                  "/following-sibling::span"
+
+    # Use on a post element
+    # Text of the selected element is the number of comments.
+    # For example:
+    #   4 Yorum
+    COMMENTS_XPATH = f".//span[{xpath_endswith('text()', 'Yorum')}]"
+
+    # Use on a post element
+    # Text of the selected element is the number of shares.
+    # For example:
+    #   1 Paylaşım
+    SHARES_XPATH = f".//span[{xpath_endswith('text()', 'Paylaşım')}]"
+
+    # Use on a post element
+    # The innermost div wrapping both reaction counts and reaction buttons
+    REACTION_BOX_XPATH = "(.//div[.//span[text()='Tüm ifadeler:'] " \
+                         "and .//div[@role='button' and @aria-label='Beğen']])[last()]"
+
+    def __init__(self, credentials, browser=None, image_encoding=DEFAULT_ENCODING, pacer=None):
+        super().__init__(browser, image_encoding, pacer)
         self.credentials = credentials
         self.logged_in = False
-        self.browser = browser if browser else browser_with_fresh_profile()
+        self.date_target = None
 
     def login(self):
         if self.logged_in:
             return
-        self.browser.get(self.FACEBOOK_HOME_URL)
-        self.browser.find_element(By.NAME, 'email').send_keys(self.credentials.email)
-        self.browser.find_element(By.NAME, 'pass').send_keys(self.credentials.password)
-        self.browser.find_element(By.NAME, 'login').click()
+        self._get(self.FACEBOOK_HOME_URL)
+        self.browser.find_element(By.NAME, self.LOGIN_EMAIL_NAME) \
+            .send_keys(self.credentials.email)
+        self.browser.find_element(By.NAME, self.LOGIN_PASSWORD_NAME) \
+            .send_keys(self.credentials.password)
+        self.browser.find_element(By.NAME, self.LOGIN_BUTTON_NAME).click()
+        try:
+            WebDriverWait(self.browser, timeout=self.LOGIN_TIMEOUT) \
+                .until(
+                EC.invisibility_of_element_located(
+                    (By.NAME, self.LOGIN_PASSWORD_NAME)))
+        except TimeoutException:
+            # Wrong credentials or a checkpoint page
+            raise LoginFailedException(
+                f"Could not login as {self.credentials.email}: {self.browser.current_url}") \
+                from None
         self.logged_in = True
 
     def full_page_screenshot(self, file_path):
         time.sleep(3)
-        self.browser.get_full_page_screenshot_as_file(str(file_path))
+        self._save_screenshot(self.browser.get_full_page_screenshot_as_png(), file_path)
 
     def go_to(self, url):
         self.login()
-        self.browser.get(url)
+        self._get(url)
+        self.url = url
 
     def go_to_posts(self):
         """NO-OP. We should already be at posts at all times."""
 
     def scroll_down(self, date_target):
-        """Click on filter, choose date_target."""
+        """
+        Filter posts by date_target's year and month, then scroll down until all posts of the
+        month are loaded.
+        """
+        self.date_target = date_target
+        self._filter_posts_by_month(date_target)
+
+        post_count = self._post_count()
+        while True:
+            self._do_scroll()
+            self._check_ban()
+            post_count = self._wait_for_more_posts(post_count)
+            if post_count is None:
+                # We hit bottom, no more posts in the month
+                break
+
+    def _requires_login(self):
+        try:
+            password = self.browser.find_element(By.NAME, self.LOGIN_PASSWORD_NAME)
+        except NoSuchElementException:
+            return False
+        if password.is_displayed():
+            # Facebook logged us out, login again after the ban
+            self.logged_in = False
+            return True
+        return False
+
+    def _filter_posts_by_month(self, date_target):
+        wait = WebDriverWait(self.browser, timeout=30)
+        wait.until(EC.element_to_be_clickable((By.XPATH, self.POSTS_FILTER_BUTTON_XPATH))) \
+            .click()
+        dialog = wait.until(EC.visibility_of_element_located((By.XPATH, self.FILTER_DIALOG_XPATH)))
+
+        month_name = self.MONTH_NAMES[date_target.month - 1]
+        for combobox_xpath, option in ((self.FILTER_YEAR_XPATH, str(date_target.year)),
+                                       (self.FILTER_MONTH_XPATH, month_name)):
+            dialog.find_element(By.XPATH, combobox_xpath).click()
+            option_xpath = self.FILTER_OPTION_XPATH.format(option)
+            wait.until(EC.element_to_be_clickable((By.XPATH, option_xpath))).click()
+
+        dialog.find_element(By.XPATH, self.FILTER_DONE_XPATH).click()
+        wait.until(EC.invisibility_of_element_located((By.XPATH, self.FILTER_DIALOG_XPATH)))
+
+    def _parse_post(self, post_element):
+        try:
+            post_time = post_element.find_element(By.XPATH, self.POST_TIME_XPATH).text
+        except NoSuchElementException:
+            post_time = ""
+        post_time = self._post_time(post_time)
+        # The time link is also the post's permalink
+        post_id = self._post_id(post_element, self.POST_TIME_XPATH)
+        likes = self._reaction_count(post_element, self.LIKES_XPATH)
+        comments = self._reaction_count(post_element, self.COMMENTS_XPATH)
+        shares = self._reaction_count(post_element, self.SHARES_XPATH)
+        return Post(post_id, post_time, likes, comments, shares)
+
+    def _post_time(self, text):
+        """
+        :param text: short date text of a post, for example 12 Nisan 2020, or 12 Nisan for posts
+                     of the current year, or 3 sa and Dün for the most recent ones
+        :return: post date as a datetime, None if text is not a date
+        """
+        now = datetime.now()
+        age_match = self.POST_AGE_REGEX.match(text)
+        if age_match:
+            age = timedelta(**{self.POST_AGE_UNITS[age_match.group(2)]: int(age_match.group(1))})
+            return self._day_of(now - age)
+        for relative, days in self.RELATIVE_DAYS.items():
+            if text.strip().startswith(relative):
+                return self._day_of(now - timedelta(days=days))
+
+        date_match = self.POST_DATE_REGEX.match(text)
+        if not date_match or date_match.group(2) not in self.MONTH_NAMES:
+            return None
+        day = int(date_match.group(1))
+        month = self.MONTH_NAMES.index(date_match.group(2)) + 1
+        year = int(date_match.group(3)) if date_match.group(3) else now.year
+        try:
+            return datetime(year, month, day)
+        except ValueError:
+            return None
+
+    @staticmethod
+    def _day_of(time):
+        # Absolute dates have no time of day, neither do relative ones
+        return datetime(time.year, time.month, time.day)
 
     def wallpaper_visibility(self, visible):
         """NO-OP wallpaper doesn't overlay posts when logged-in"""
 
     def filter_by(self, predicate, consumer):
-        """Parse posts, apply by predicate, supply to consumer."""
+        """
+        :param predicate: A predicate function that takes a Post as input.
 
-    def close(self):
-        self.browser.close()
+        :param consumer: A callback function to be called with parsed post and post element
+                         matching the predicate.
+        """
+        seen_post_ids = set()
+        post_elements = self.browser.find_elements(By.XPATH, self.POST_XPATH)
+        for post_element in post_elements:
+            post = self._parse_post(post_element)
+            # Pinned or shared posts may be inserted into the feed more than once
+            if post.post_id is not None:
+                if post.post_id in seen_post_ids:
+                    continue
+                seen_post_ids.add(post.post_id)
+            if post.time is None:
+                _logger.warning("Ignoring post %s with unreadable date in %s",
+                                post.post_id, self.url)
+                continue
+            if predicate(post):
+                consumer(post, post_element)
+
+    def element_screenshot_as_png(self, element):
+        self._scroll_into_view(element)
+        return element.screenshot_as_png
+
+    def post_reactions_screenshot(self, post_element, file_path):
+        """
+            Takes a screenshot of the given element after moving to it.
+            :param post_element: the dom element for the post
+            :param file_path: path to save file, relative to current working directory
+        """
+        # Read by ocr.py, keep every pixel
+        self._save_screenshot(self.post_reactions_screenshot_as_png(post_element), file_path,
+                              lossless=True)
+
+    def post_reactions_screenshot_as_png(self, post_element):
+        """
+            Same as post_reactions_screenshot, returns the screenshot as PNG bytes.
+        """
+        try:
+            reaction_box = post_element.find_element(By.XPATH, self.REACTION_BOX_XPATH)
+        except NoSuchElementException:
+            reaction_box = post_element
+        self._scroll_into_view(reaction_box)
+        return reaction_box.screenshot_as_png
@@ -0,0 +1,43 @@
+import logging
+
+_logger = logging.getLogger(__name__)
+
+
+class PostIndex:
+    """
+        Post identifiers already processed for an account, kept in memory and appended to a
+        file with one identifier per line, so that each post is parsed, screenshotted and
+        OCRed once per run and across reruns.
+    """
+
+    def __init__(self, file_path):
+        """
+            :param file_path: path of the index file, created on first add if missing
+        """
+        self.file_path = file_path
+        self.post_ids = set()
+        if file_path.exists():
+            with file_path.open(mode="r", encoding="utf-8") as index:
+                self.post_ids.update(line.strip() for line in index if line.strip())
+        _logger.debug("Loaded %s post ids from %s", len(self.post_ids), file_path)
+
+    def __contains__(self, post_id):
+        return post_id in self.post_ids
+
+    def __len__(self):
+        return len(self.post_ids)
+
+    def add(self, post_id):
+        """
+            :param post_id: identifier of a processed post, ignored if None
+            :return: False if post_id is already indexed, True otherwise
+        """
+        if post_id is None:
+            # Can not tell a post without an identifier apart from the others, keep it anyway
+            return True
+        if post_id in self.post_ids:
+            return False
+        self.post_ids.add(post_id)
+        with self.file_path.open(mode="a+", encoding="utf-8") as index:
+            index.write(f"{post_id}\n")
+        return True
@@ -0,0 +1,193 @@
+import argparse
+import csv
+import logging
+import sys
+from collections import namedtuple
+from pathlib import Path
+
+import numpy as np
+
+_logger = logging.getLogger(__name__)
+
+DOM_DIR = Path("DOM")
+OCR_DIR = Path("OCR")
+
+ACCOUNTS_CSV_PATH = Path("bot-facebook_reconciliation.csv")
+ACCOUNTS_HEADERS = ["URL_MD5", "DOMGonderi", "OCRGonderi", "Eslesen", "Uyusmayan",
+                    "OCRHatasi", "OCRBelirsiz", "BegeniFarki", "YorumFarki", "PaylasimFarki"]
+
+POSTS_CSV_PATH = Path("bot-facebook_reconciliation_posts.csv")
+POSTS_HEADERS = ["URL_MD5", "Sira", "DOMBegeni", "DOMYorum", "DOMPaylasim",
+                 "OCRBegeni", "OCRYorum", "OCRPaylasim", "OCRHatasi", "OCRBelirsiz"]
+
+CSV_PATTERN = "bot_facebook_*.csv"
+
+# Columnar statistics of a csv directory, one entry per post, sorted by account and page order
+#   accounts: account code of each post, index into Stats.hashes
+#   orders: 0 based page order of each post in its account
+#   counts: (likes, comments, shares) of each post
+Stats = namedtuple('Stats', ['hashes', 'accounts', 'orders', 'counts'])
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Compares statistics parsed from DOM with the ones recognized by OCR.")
+    parser.add_argument("--dom-dir", default=str(DOM_DIR),
+                        help="Enter the DOM csv source directory")
+    parser.add_argument("--ocr-dir", default=str(OCR_DIR),
+                        help="Enter the OCR csv source directory")
+    args = parser.parse_args()
+
+    dom_dir, ocr_dir = Path(args.dom_dir), Path(args.ocr_dir)
+    for csv_dir in (dom_dir, ocr_dir):
+        if not csv_dir.is_dir():
+            _logger.critical("%s is not a directory, use with -h for help.", csv_dir)
+            return
+
+    reconcile(load_stats(dom_dir), load_stats(ocr_dir), ocr_dir)
+
+
+def load_stats(csv_dir):
+    """
+    Loads every bot_facebook_[URL_MD5_HASH].csv in csv_dir into columnar arrays.
+    :param csv_dir: either DOM or OCR directory
+    :return: Stats of the directory
+    """
+    hashes, row_counts, tokens = [], [], []
+    for file in sorted(csv_dir.glob(CSV_PATTERN)):
+        # csv rows are just three integers, skip the csv module
+        file_tokens = file.read_text(encoding="utf-8").replace(",", " ").split()
+        if len(file_tokens) % 3:
+            _logger.error("%s has malformed rows, ignoring.", file)
+            continue
+        hashes.append(file.name[len("bot_facebook_"):-4])
+        row_counts.append(len(file_tokens) // 3)
+        tokens.extend(file_tokens)
+
+    row_counts = np.array(row_counts, dtype=np.int64)
+    counts = np.array(tokens, dtype=np.int64).reshape(-1, 3)
+    accounts = np.repeat(np.arange(len(hashes), dtype=np.int64), row_counts)
+    # page order restarts at every account
+    starts = np.repeat(np.cumsum(row_counts) - row_counts, row_counts)
+    orders = np.arange(len(counts), dtype=np.int64) - starts
+    _logger.info("Loaded %s posts of %s accounts from %s", len(counts), len(hashes), csv_dir)
+    return Stats(hashes, accounts, orders, counts)
+
+
+def reconcile(dom, ocr, ocr_dir):
+    # Both sides share account codes, so that (account, order) keys are comparable
+    hashes = sorted(set(dom.hashes) | set(ocr.hashes))
+    codes = {url_hash: code for code, url_hash in enumerate(hashes)}
+    dom_keys = _keys(dom, codes)
+    ocr_keys = _keys(ocr, codes)
+
+    _, dom_ind, ocr_ind = np.intersect1d(dom_keys, ocr_keys, assume_unique=True,
+                                         return_indices=True)
+    accounts = dom_keys[dom_ind] >> 32
+    orders = dom_keys[dom_ind] & 0xFFFFFFFF
+    dom_counts = dom.counts[dom_ind]
+    ocr_counts = ocr.counts[ocr_ind]
+    diffs = dom_counts - ocr_counts
+    mismatched = np.any(diffs != 0, axis=1)
+    fallbacks, unknowns = _fallbacks(ocr_counts, accounts, orders, hashes, ocr_dir)
+
+    n_accounts = len(hashes)
+    dom_posts = np.bincount(dom_keys >> 32, minlength=n_accounts)
+    ocr_posts = np.bincount(ocr_keys >> 32, minlength=n_accounts)
+    matched_posts = np.bincount(accounts, minlength=n_accounts)
+    mismatched_posts = np.bincount(accounts, weights=mismatched, minlength=n_accounts)
+    fallback_posts = np.bincount(accounts, weights=fallbacks, minlength=n_accounts)
+    unknown_posts = np.bincount(accounts, weights=unknowns, minlength=n_accounts)
+    # Per column sum of differences, a positive value means OCR read less than DOM
+    count_diffs = np.stack([np.bincount(accounts, weights=diffs[:, col], minlength=n_accounts)
+                            for col in range(3)], axis=1)
+
+    with ACCOUNTS_CSV_PATH.open(newline='', mode="w", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        writer.writerow(ACCOUNTS_HEADERS)
+        writer.writerows(
+            [url_hash, *row] for url_hash, row in zip(
+                hashes,
+                np.column_stack((dom_posts, ocr_posts, matched_posts, mismatched_posts,
+                                 fallback_posts, unknown_posts, count_diffs))
+                .astype(np.int64).tolist()))
+
+    # Only the posts needing attention, to keep the report compact
+    report = np.flatnonzero(mismatched | fallbacks)
+    with POSTS_CSV_PATH.open(newline='', mode="w", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        writer.writerow(POSTS_HEADERS)
+        writer.writerows(
+            [hashes[account], order + 1, *dom_row, *ocr_row, int(fallback), int(unknown)]
+            for account, order, dom_row, ocr_row, fallback, unknown in zip(
+                accounts[report].tolist(), orders[report].tolist(),
+                dom_counts[report].tolist(), ocr_counts[report].tolist(),
+                fallbacks[report].tolist(), unknowns[report].tolist()))
+
+    _logger.info("%s of %s matched posts differ, %s OCR fallbacks, %s unknown zero rows, "
+                 "%s DOM and %s OCR posts without a counterpart.",
+                 int(mismatched.sum()), len(accounts), int(fallbacks.sum()),
+                 int(unknowns.sum()),
+                 len(dom_keys) - len(accounts), len(ocr_keys) - len(accounts))
+
+
+def _keys(stats, codes):
+    """
+    :return: a sortable (account, order) key for each post of stats, account in the high 32 bits
+    """
+    account_codes = np.array([codes[url_hash] for url_hash in stats.hashes], dtype=np.int64)
+    return (account_codes[stats.accounts] << 32) | stats.orders
+
+
+def _fallbacks(ocr_counts, accounts, orders, hashes, ocr_dir):
+    """
+    ocr.py writes zeros when TesseractOutputParser fails. Real zeros are told apart by parsing
+    the saved tesseract outputs again, other rows can not be fallbacks.
+    :return: two boolean arrays, True for OCR rows written as a fallback, and True for zero rows
+             whose tesseract output is missing, so that they can be neither confirmed nor ruled out
+    """
+    zeros = np.all(ocr_counts == 0, axis=1)
+    fallbacks = np.zeros(len(zeros), dtype=bool)
+    unknowns = zeros.copy()
+    candidates = np.flatnonzero(zeros)
+    if not len(candidates):
+        return fallbacks, unknowns
+
+    # ocr.py appends rows in sorted file name order, the same order gives each row's output
+    outputs = {}
+    for file in sorted(ocr_dir.glob("bot_facebook_*_*_*.txt")):
+        outputs.setdefault(file.name.split("_")[3], []).append(file)
+
+    # candidates are sorted by account, split them into one group per account
+    candidate_accounts = accounts[candidates]
+    group_starts = np.flatnonzero(np.diff(candidate_accounts, prepend=-1))
+    for rows in np.split(candidates, group_starts[1:]):
+        files = outputs.get(hashes[accounts[rows[0]]], [])
+        # Only the outputs of zero rows, the others can not be fallbacks
+        known = rows[orders[rows] < len(files)]
+        unknowns[known] = False
+        fallbacks[known] = ~_parse_outputs([files[order] for order in orders[known]])
+    return fallbacks, unknowns
+
+
+def _parse_outputs(files):
+    """
+    :param files: tesseract output files to parse
+    :return: a boolean array, True where TesseractOutputParser can parse the output
+    """
+    # Imported here, as it is only needed when there are zero rows
+    from ocr import TesseractOutputParser
+    parsed = np.ones(len(files), dtype=bool)
+    for ind, file in enumerate(files):
+        try:
+            TesseractOutputParser(file.read_text(encoding="utf-8")).to_post_data()
+        except ValueError:
+            parsed[ind] = False
+    return parsed
+
+
+if __name__ == '__main__':
+    logging.basicConfig(level=logging.INFO,
+                        format='%(asctime)s [%(levelname)s]: %(message)s',
+                        stream=sys.stdout)
+    main()
@@ -0,0 +1,74 @@
+import argparse
+import logging
+import sys
+from pathlib import Path
+
+from images import IMAGE_PATTERNS, add_encoding_arguments, encoding_from_args, open_image, \
+    save_image
+
+_logger = logging.getLogger(__name__)
+
+OCR_DIR_NAME = "OCR"
+
+# Only files named by main.py are touched
+SCREENSHOT_PATTERN = "bot_facebook_*"
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Re-encodes existing screenshots, removing the originals.")
+    parser.add_argument("--dir", default=".",
+                        help="Enter the directory main.py is run in, its screenshots and the "
+                             "ones in its OCR directory are re-encoded")
+    add_encoding_arguments(parser)
+    args = parser.parse_args()
+
+    try:
+        encoding = encoding_from_args(args)
+    except ValueError as val_err:
+        _logger.critical("Illegal encoding parameter: %s", val_err)
+        return
+
+    src_dir = Path(args.dir)
+    if not src_dir.is_dir():
+        _logger.critical("Missing or illegal --dir parameter, use with -h for help.")
+        return
+
+    reencode(src_dir, encoding)
+
+
+def screenshots(src_dir):
+    """
+    :param src_dir: the directory main.py is run in
+    :return: (path, lossless) of screenshots saved by main.py, in src_dir and its OCR directory
+    """
+    # Reaction boxes are read by tesseract, never downscale them
+    for directory, lossless in ((src_dir, False), (src_dir / OCR_DIR_NAME, True)):
+        for file in sorted(directory.glob(SCREENSHOT_PATTERN)):
+            if file.is_file() and any(file.match(pattern) for pattern in IMAGE_PATTERNS):
+                yield file, lossless
+
+
+def reencode(src_dir, encoding):
+    saved = 0
+    for file, lossless in screenshots(src_dir):
+        old_size = file.stat().st_size
+        with open_image(file) as img:
+            img.load()
+            tmp_path = save_image(img, file.with_name(f".{file.stem}.tmp"), encoding, lossless)
+        new_path = file.with_suffix(tmp_path.suffix)
+        if new_path != file:
+            file.unlink()
+        tmp_path.replace(new_path)
+
+        new_size = new_path.stat().st_size
+        saved += old_size - new_size
+        _logger.debug("%s: %s -> %s bytes", new_path, old_size, new_size)
+    _logger.info("Re-encoded screenshots in %s, saved %s bytes", src_dir, saved)
+
+
+if __name__ == '__main__':
+    logging.basicConfig(level=logging.INFO,
+                        format='%(asctime)s [%(levelname)s]: %(message)s',
+                        stream=sys.stdout)
+    main()
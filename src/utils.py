@@ -1,3 +1,6 @@
+import re
+
+
 def xpath_endswith(src, target):
     """
     :param src:
@@ -6,3 +9,33 @@ def xpath_endswith(src, target):
     """
     target_len = len(target)
     return f"substring({src}, string-length({src}) - {target_len} +1) = '{target}'"
+
+
+POST_ID_REGEXES = (
+    # permalink.php?story_fbid=123&id=456
+    re.compile(r"[?&]story_fbid=([\w-]+)"),
+    # /besiktasbelediyesi/posts/123 or /user/posts/pfbid0abc
+    re.compile(r"/posts/([\w-]+)"),
+    # /watch/?v=123
+    re.compile(r"[?&]v=(\d+)"),
+    # photo.php?fbid=42&set=a.456 or /photo/?fbid=999&set=a.456
+    re.compile(r"[?&]fbid=(\d+)"),
+    # /besiktasbelediyesi/videos/123/ or /besiktasbelediyesi/photos/a.456/123/
+    re.compile(r"/(?:videos|photos)/(?:[\w.-]+/)?(\d+)"),
+)
+
+
+def post_id_from_permalink(href):
+    """
+    :param href: permalink of a post, as found in the post's time link
+    :return: a stable identifier of the post, or None if href is empty or of an unknown format
+    """
+    if not href:
+        return None
+    for regex in POST_ID_REGEXES:
+        match = regex.search(href)
+        if match:
+            return match.group(1)
+    # Unknown permalink format, a guess might give different posts the same identifier,
+    # better not to tell them apart than to lose them
+    return None
@@ -0,0 +1,133 @@
+"""
+A stand-in for a Selenium WebDriver, serving local HTML files and evaluating XPaths with lxml.
+
+Just enough browser behavior for the scrapers:
+    * elements having a hidden attribute, or an ancestor with one, are not displayed
+    * clicking an element with data-show or data-hide attribute shows or hides the element
+      with the given id
+    * scrolling to the bottom loads the next HTML file of the current url, if there is one,
+      after load_delay seconds
+"""
+import time
+from pathlib import Path
+
+from lxml import html
+from selenium.common.exceptions import NoSuchElementException
+from selenium.webdriver.common.by import By
+
+FIXTURES_DIR = Path(__file__).parent / "fixtures"
+
+
+def fixture(name):
+    return (FIXTURES_DIR / name).read_text(encoding="utf-8")
+
+
+def _xpath(by, value):
+    if by == By.XPATH:
+        return value
+    if by == By.NAME:
+        return f"//*[@name='{value}']"
+    raise NotImplementedError(by)
+
+
+class FakeElement:
+
+    def __init__(self, browser, node):
+        self.browser = browser
+        self.node = node
+
+    def find_element(self, by=By.XPATH, value=None):
+        elements = self.find_elements(by, value)
+        if not elements:
+            raise NoSuchElementException(value)
+        return elements[0]
+
+    def find_elements(self, by=By.XPATH, value=None):
+        return [FakeElement(self.browser, node) for node in self.node.xpath(_xpath(by, value))]
+
+    @property
+    def text(self):
+        return " ".join(self.node.text_content().split())
+
+    def get_attribute(self, name):
+        return self.node.get(name)
+
+    def is_displayed(self):
+        return not any(node.get("hidden") is not None
+                       for node in self.node.iterancestors(None)) \
+            and self.node.get("hidden") is None
+
+    def is_enabled(self):
+        return True
+
+    def click(self):
+        self.browser.clicks.append(self.text or self.get_attribute("aria-label"))
+        shown, hidden = self.get_attribute("data-show"), self.get_attribute("data-hide")
+        if shown:
+            self.browser.document.get_element_by_id(shown).attrib.pop("hidden", None)
+        if hidden:
+            self.browser.document.get_element_by_id(hidden).set("hidden", "")
+
+    def send_keys(self, keys):
+        self.node.set("value", keys)
+
+    @property
+    def screenshot_as_png(self):
+        return html.tostring(self.node)
+
+    def __eq__(self, other):
+        return isinstance(other, FakeElement) and self.node is other.node
+
+    def __hash__(self):
+        return hash(self.node)
+
+
+class FakeBrowser:
+
+    def __init__(self, pages, load_delay=0):
+        """
+        :param pages: url to a list of HTML strings, each one loaded by a scroll to the bottom
+        :param load_delay: seconds it takes for the next HTML string to load after a scroll
+        """
+        self.pages = pages
+        self.load_delay = load_delay
+        self.loading = None
+        self.current_url = None
+        self.page = 0
+        self.document = None
+        self.clicks = []
+        self.scrolls = 0
+        self.scripts = []
+
+    def get(self, url):
+        self.current_url = url
+        self._load(0)
+
+    def _load(self, page):
+        self.page = page
+        self.loading = None
+        self.document = html.document_fromstring(self.pages[self.current_url][page])
+
+    def _finish_loading(self):
+        if self.loading and time.monotonic() >= self.loading[1]:
+            self._load(self.loading[0])
+
+    def find_element(self, by=By.XPATH, value=None):
+        self._finish_loading()
+        return FakeElement(self, self.document).find_element(by, value)
+
+    def find_elements(self, by=By.XPATH, value=None):
+        self._finish_loading()
+        return FakeElement(self, self.document).find_elements(by, value)
+
+    def execute_script(self, script, *args):
+        self.scripts.append((script, args))
+        if "window.scrollTo" in script:
+            self.scrolls += 1
+            if self.page + 1 < len(self.pages[self.current_url]) and not self.loading:
+                self.loading = (self.page + 1, time.monotonic() + self.load_delay)
+                self._finish_loading()
+        return None
+
+    def close(self):
+        pass
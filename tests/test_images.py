@@ -0,0 +1,56 @@
+from PIL import Image
+
+from images import OCR_PADDING, ImageEncoding, open_image, save_image, trim_margins
+from reencode import reencode
+
+WEBP_TRIMMED = ImageEncoding("WEBP", 20, True)
+
+
+def screenshot(width=400, height=300):
+    """A white image with a black 50x20 box at (100, 100)"""
+    img = Image.new("RGB", (width, height), "white")
+    img.paste(Image.new("RGB", (50, 20), "black"), (100, 100))
+    return img
+
+
+def test_trim_margins():
+    assert trim_margins(screenshot()).size == (50, 20)
+    assert trim_margins(screenshot(), padding=5).size == (60, 30)
+    # padding never goes beyond the image
+    assert trim_margins(screenshot(160, 130), padding=100).size == (160, 130)
+
+
+def test_save_image_keeps_padding_and_size_when_lossless(tmp_path):
+    path = save_image(screenshot(), tmp_path / "reaction.png", WEBP_TRIMMED, lossless=True)
+    assert path.suffix == ".webp"
+    with open_image(path) as img:
+        assert img.size == (50 + 2 * OCR_PADDING, 20 + 2 * OCR_PADDING)
+
+
+def test_save_image_downscales(tmp_path):
+    path = save_image(screenshot(), tmp_path / "post.png", WEBP_TRIMMED)
+    with open_image(path) as img:
+        assert img.size == (20, 8)
+
+
+def test_reencode_only_touches_screenshots(tmp_path):
+    (tmp_path / "OCR").mkdir()
+    (tmp_path / "venv").mkdir()
+    save_image(screenshot(), tmp_path / "bot_facebook_202110_abc.png")
+    save_image(screenshot(), tmp_path / "OCR" / "bot_facebook_202110_abc_0001.png")
+    save_image(screenshot(), tmp_path / "logo.png")
+    save_image(screenshot(), tmp_path / "venv" / "bot_facebook_icon.png")
+
+    reencode(tmp_path, WEBP_TRIMMED)
+
+    assert sorted(str(path.relative_to(tmp_path)) for path in tmp_path.rglob("*.*")) == [
+        "OCR/bot_facebook_202110_abc_0001.webp",
+        "bot_facebook_202110_abc.webp",
+        "logo.png",
+        "venv/bot_facebook_icon.png",
+    ]
+    with open_image(tmp_path / "bot_facebook_202110_abc.webp") as img:
+        assert img.width == 20
+    # reaction boxes are not downscaled
+    with open_image(tmp_path / "OCR" / "bot_facebook_202110_abc_0001.webp") as img:
+        assert img.width == 50 + 2 * OCR_PADDING
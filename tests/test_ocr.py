@@ -0,0 +1,93 @@
+from io import BytesIO
+from pathlib import Path
+
+import pytest
+from PIL import Image
+
+import ocr
+
+PARSABLE = "{} 2 Yorum Beğen Yorum yap Paylaş"
+
+
+def reaction_box(width):
+    buffer = BytesIO()
+    Image.new("RGB", (width, 5), "white").save(buffer, "PNG")
+    return buffer.getvalue()
+
+
+def fake_recognize(png):
+    """Stands in for tesseract, the image width tells what to do"""
+    width = Image.open(BytesIO(png)).width
+    if width % 3 == 0:
+        raise OSError("tesseract is not installed")
+    if width % 3 == 1:
+        return PARSABLE.format(width)
+    return "unreadable"
+
+
+@pytest.fixture
+def work_dir(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    (tmp_path / "OCR").mkdir()
+    # replaced before the worker processes are forked
+    monkeypatch.setattr(ocr, "recognize", fake_recognize)
+    return tmp_path
+
+
+def image_path(order):
+    return Path("OCR") / f"bot_facebook_202110_abc_{order:04d}.png"
+
+
+def test_tesseract_output_parser():
+    assert ocr.TesseractOutputParser("13 4 Yorum 5 Paylaşım\nBeğen Yorum yap Paylaş") \
+               .to_post_data() == ("13", "4", "5")
+    with pytest.raises(ValueError):
+        ocr.TesseractOutputParser("13 4 Yorum").to_post_data()
+
+
+def test_inline_ocr_keeps_page_order_and_failed_images(work_dir):
+    stage = ocr.InlineOcr(workers=2, max_pending=2)
+    for order in range(1, 8):
+        stage.submit(reaction_box(order), image_path(order))
+    stage.close()
+
+    rows = (work_dir / "OCR" / "bot_facebook_abc.csv").read_text(encoding="utf-8").split()
+    # tesseract errors and unparsable outputs are written as zeros, in place
+    assert rows == ["1,2,0", "0,0,0", "0,0,0", "4,2,0", "0,0,0", "0,0,0", "7,2,0"]
+    assert sorted(path.name for path in (work_dir / "OCR").glob("*.png")) == \
+           [image_path(order).name for order in (2, 3, 5, 6)]
+    assert len(list((work_dir / "OCR").glob("*.txt"))) == 7
+
+
+def test_inline_ocr_keep_images(work_dir):
+    stage = ocr.InlineOcr(keep_images=True, workers=1)
+    stage.submit(reaction_box(1), image_path(1))
+    stage.close()
+    assert (work_dir / image_path(1)).exists()
+
+
+def test_close_shuts_down_on_errors(work_dir, monkeypatch):
+    stage = ocr.InlineOcr(workers=1)
+    stage.submit(reaction_box(1), image_path(1))
+
+    def fail(image_path, tes_text):
+        raise OSError("disk full")
+    monkeypatch.setattr(ocr, "save_ocr_result", fail)
+
+    with pytest.raises(OSError):
+        stage.close()
+    # the executor is shut down, it takes no more work
+    with pytest.raises(RuntimeError):
+        stage.executor.submit(print)
+
+
+def test_on_saved_runs_after_the_row_is_saved(work_dir):
+    csv_path = work_dir / "OCR" / "bot_facebook_abc.csv"
+    saved = []
+    stage = ocr.InlineOcr(workers=1)
+    for order in (1, 2):
+        stage.submit(reaction_box(order), image_path(order),
+                     lambda: saved.append(len(csv_path.read_text(encoding="utf-8").split())))
+    stage.flush()
+    assert saved == [1, 2]
+    stage.close()
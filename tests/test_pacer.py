@@ -0,0 +1,98 @@
+import pytest
+
+from pacer import RequestPacer
+
+
+class FakeClock:
+
+    def __init__(self):
+        self.now = 0.0
+        self.sleeps = []
+
+    def __call__(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+
+@pytest.fixture
+def clock():
+    return FakeClock()
+
+
+def pacer_with(clock, **kwargs):
+    kwargs.setdefault("jitter", 0)
+    return RequestPacer(clock=clock, sleep=clock.sleep, **kwargs)
+
+
+def test_acquire_paces_at_rate(clock):
+    pacer = pacer_with(clock, rate=0.2)
+    for _ in range(4):
+        pacer.acquire()
+    # first request uses the initial token
+    assert clock.sleeps == pytest.approx([5, 5, 5])
+
+
+def test_acquire_allows_bursts_up_to_capacity(clock):
+    pacer = pacer_with(clock, rate=0.2, capacity=2)
+    pacer.acquire()
+    clock.now += 60
+    pacer.acquire()
+    pacer.acquire()
+    assert clock.sleeps == []
+    pacer.acquire()
+    assert clock.sleeps == pytest.approx([5])
+
+
+def test_jitter_adds_a_bounded_delay(clock):
+    pacer = pacer_with(clock, rate=0.2, jitter=0.5)
+    pacer.acquire()
+    assert len(clock.sleeps) == 1
+    assert 0 <= clock.sleeps[0] <= 2.5
+
+
+def test_feedback_speeds_up_without_login_walls(clock):
+    pacer = pacer_with(clock, rate=0.2, max_rate=0.5, rate_step=0.1)
+    pacer.feedback(False)
+    assert pacer.rate == pytest.approx(0.3)
+    for _ in range(10):
+        pacer.feedback(False)
+    assert pacer.rate == pytest.approx(0.5)
+
+
+def test_feedback_backs_off_on_login_walls(clock):
+    pacer = pacer_with(clock, rate=0.2, min_rate=0.04)
+    pacer.feedback(True)
+    assert pacer.rate == pytest.approx(0.1)
+    for _ in range(10):
+        pacer.feedback(True)
+    assert pacer.rate == pytest.approx(0.04)
+    # no burst right after a wall
+    pacer.acquire()
+    assert clock.sleeps == pytest.approx([25])
+
+
+def test_pause_for_ban_backs_off_exponentially(clock):
+    pacer = pacer_with(clock, ban_pause=60, max_ban_pause=300, max_bans=4)
+    while pacer.pause_for_ban():
+        pass
+    assert clock.sleeps == [60, 120, 240, 300]
+
+
+def test_resumes_at_halved_rate_after_ban(clock):
+    pacer = pacer_with(clock, rate=0.2)
+    # a login wall while scrolling, then a ban
+    pacer.feedback(True)
+    assert pacer.pause_for_ban()
+    assert pacer.rate == pytest.approx(0.1)
+
+
+def test_successful_request_resets_ban_count(clock):
+    pacer = pacer_with(clock, ban_pause=60, max_bans=2)
+    assert pacer.pause_for_ban()
+    assert pacer.pause_for_ban()
+    pacer.feedback(False)
+    assert pacer.pause_for_ban()
+    assert clock.sleeps == [60, 120, 60]
@@ -0,0 +1,27 @@
+from post_index import PostIndex
+
+
+def test_add_and_contains(tmp_path):
+    index = PostIndex(tmp_path / "index.lst")
+    assert "1" not in index
+    assert index.add("1")
+    assert "1" in index
+    assert not index.add("1")
+    assert len(index) == 1
+
+
+def test_posts_without_id_are_never_indexed(tmp_path):
+    index = PostIndex(tmp_path / "index.lst")
+    assert index.add(None)
+    assert index.add(None)
+    assert None not in index
+    assert len(index) == 0
+
+
+def test_persists_across_runs(tmp_path):
+    index_path = tmp_path / "index.lst"
+    PostIndex(index_path).add("1")
+    PostIndex(index_path).add("2")
+    index = PostIndex(index_path)
+    assert "1" in index and "2" in index
+    assert len(index) == 2
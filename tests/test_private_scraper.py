@@ -0,0 +1,125 @@
+from collections import namedtuple
+from datetime import datetime
+
+import pytest
+
+from exceptions import LoginFailedException, TemporarilyBannedException
+from fake_browser import FakeBrowser, fixture
+from pacer import RequestPacer
+from parsers import PrivateAccountScraper
+
+PROFILE_URL = "https://www.facebook.com/profile.php?id=1"
+
+Credentials = namedtuple('Credentials', ['email', 'password'])
+
+APRIL_2021 = datetime(2021, 4, 1)
+
+
+class FrozenDatetime(datetime):
+    """Stands in for datetime, so that relative post dates are resolved in April 2021"""
+
+    @classmethod
+    def now(cls, tz=None):
+        return cls(2021, 4, 2, 1, 30)
+
+
+def in_april_2021(post):
+    return (post.time.year, post.time.month) == (2021, 4)
+
+
+@pytest.fixture
+def browser():
+    return FakeBrowser({
+        PrivateAccountScraper.FACEBOOK_HOME_URL: [fixture("login.html")],
+        PROFILE_URL: [fixture("private_posts_1.html"), fixture("private_posts_2.html")],
+    })
+
+
+@pytest.fixture
+def scraper(browser, monkeypatch):
+    monkeypatch.setattr(PrivateAccountScraper, "NEW_POSTS_TIMEOUT", 0.1)
+    pacer = RequestPacer(rate=1000, max_rate=1000, jitter=0)
+    return PrivateAccountScraper(Credentials("me@example.com", "secret"), browser, pacer=pacer)
+
+
+def test_go_to_logs_in_once(scraper, browser):
+    scraper.go_to(PROFILE_URL)
+    scraper.go_to(PROFILE_URL)
+    assert browser.clicks == ["Giriş Yap"]
+    assert browser.current_url == PROFILE_URL
+    assert scraper.logged_in
+
+
+def test_failed_login(browser, scraper, monkeypatch):
+    monkeypatch.setattr(PrivateAccountScraper, "LOGIN_TIMEOUT", 0.1)
+    browser.pages[PrivateAccountScraper.FACEBOOK_HOME_URL] = [fixture("login_checkpoint.html")]
+    with pytest.raises(LoginFailedException):
+        scraper.go_to(PROFILE_URL)
+    assert not scraper.logged_in
+
+
+def test_logged_out_while_scrolling_is_a_ban(scraper, browser):
+    scraper.go_to(PROFILE_URL)
+    rate = scraper.pacer.rate
+    browser.pages[PROFILE_URL] = [fixture("login_checkpoint.html")]
+    browser.get(PROFILE_URL)
+    with pytest.raises(TemporarilyBannedException):
+        scraper._check_ban()
+    assert scraper.pacer.rate < rate
+    # logs in again when resumed
+    assert not scraper.logged_in
+
+
+def test_filter_posts_by_month(scraper, browser):
+    scraper.go_to(PROFILE_URL)
+    browser.clicks.clear()
+    scraper._filter_posts_by_month(APRIL_2021)
+    assert browser.clicks == ["Filtreler", "Yıl", "2021", "Ay", "Nisan", "Bitti"]
+    assert not browser.find_element(value=PrivateAccountScraper.FILTER_DIALOG_XPATH).is_displayed()
+
+
+def test_scroll_down_stops_at_bottom(scraper, browser):
+    scraper.go_to(PROFILE_URL)
+    scraper.scroll_down(APRIL_2021)
+    # first scroll loads more posts, the second one does not
+    assert browser.scrolls == 4
+    assert browser.page == 1
+    assert len(browser.find_elements(value=PrivateAccountScraper.POST_XPATH)) == 6
+
+
+def test_parse_post(scraper, browser):
+    scraper.go_to(PROFILE_URL)
+    post_elements = browser.find_elements(value=PrivateAccountScraper.POST_XPATH)
+    posts = [scraper._parse_post(element) for element in post_elements]
+    assert posts[1] == ("101", datetime(2021, 4, 28), 13, 4, 5)
+    assert posts[2] == ("102", datetime(2021, 4, 12), 7, 0, 2)
+
+
+@pytest.mark.parametrize("text, post_time", [
+    ("12 Nisan 2020", datetime(2020, 4, 12)),
+    ("5 Ağustos 2019 14:30", datetime(2019, 8, 5)),
+    ("1 Şubat", datetime(2021, 2, 1)),
+    ("31 Şubat 2021", None),
+    ("Şimdi", datetime(2021, 4, 2)),
+    ("45 dk", datetime(2021, 4, 2)),
+    ("3 sa", datetime(2021, 4, 1)),
+    ("3 s", datetime(2021, 4, 1)),
+    ("5 g", datetime(2021, 3, 28)),
+    ("Dün saat 14:30", datetime(2021, 4, 1)),
+    ("Dün", datetime(2021, 4, 1)),
+    ("Paylaşıldı", None),
+    ("", None),
+])
+def test_post_time(scraper, text, post_time, monkeypatch):
+    monkeypatch.setattr("parsers.datetime", FrozenDatetime)
+    assert scraper._post_time(text) == post_time
+
+
+def test_filter_by(scraper, browser, monkeypatch):
+    monkeypatch.setattr("parsers.datetime", FrozenDatetime)
+    scraper.go_to(PROFILE_URL)
+    scraper.scroll_down(APRIL_2021)
+    consumed = []
+    scraper.filter_by(in_april_2021, lambda post, element: consumed.append(post))
+    # out of month and duplicate posts are not consumed, a post of a moment ago is
+    assert [post.post_id for post in consumed] == ["101", "102", "103", "104"]
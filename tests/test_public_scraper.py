@@ -0,0 +1,78 @@
+from datetime import datetime
+
+import pytest
+
+from fake_browser import FakeBrowser, fixture
+from pacer import RequestPacer
+from parsers import Post, PublicAccountScraper
+
+POSTS_URL = "https://www.facebook.com/besiktasbelediyesi/posts"
+
+
+def posts_page(*months):
+    """A public posts page, with the month of each post in an attribute"""
+    posts = "\n".join(f'<div class="userContentWrapper" data-month="{month}">post</div>'
+                      for month in months)
+    return f"""<html><body>
+        <div id="entity_sidebar"><div><a href="{POSTS_URL}"><span>Gönderiler</span></a></div></div>
+        <div id="globalContainer"><div id="content_container">
+            <div id="pagelet_timeline_main_column">{posts}</div>
+        </div></div>
+    </body></html>"""
+
+
+@pytest.fixture
+def browser():
+    browser = FakeBrowser({POSTS_URL: [fixture("public_posts.html")]})
+    browser.get(POSTS_URL)
+    return browser
+
+
+@pytest.fixture(autouse=True)
+def parse_month(monkeypatch):
+    # Dates are localized, the fixtures have the month in an attribute instead
+    monkeypatch.setattr(
+        PublicAccountScraper, "_parse_post",
+        lambda self, element: Post(None, datetime(2021, int(element.get_attribute("data-month")),
+                                                  1), 0, 0, 0))
+
+
+def scraper_for(browser):
+    return PublicAccountScraper(browser, pacer=RequestPacer(rate=1000, max_rate=1000, jitter=0))
+
+
+def test_filter_by_prepares_only_matched_posts_once(browser):
+    consumed = []
+    scraper_for(browser).filter_by(lambda post: post.time.month == 4,
+                                   lambda post, element: consumed.append(element.text))
+
+    assert consumed == ["matching post", "another matching post"]
+    prepare_calls = [args for script, args in browser.scripts
+                     if script == PublicAccountScraper.PREPARE_SCREENSHOTS_SCRIPT]
+    assert len(prepare_calls) == 1
+    assert [element.text for element in prepare_calls[0][1]] == consumed
+
+
+def test_filter_by_does_not_prepare_without_matches(browser):
+    scraper_for(browser).filter_by(lambda post: False, lambda post, element: None)
+    assert not browser.scripts
+
+
+def test_scroll_down_waits_for_slowly_loading_posts(monkeypatch):
+    monkeypatch.setattr(PublicAccountScraper, "NEW_POSTS_TIMEOUT", 2)
+    browser = FakeBrowser({POSTS_URL: [posts_page(6, 5), posts_page(6, 5, 4, 4),
+                                       posts_page(6, 5, 4, 4, 3)]}, load_delay=0.3)
+    browser.get(POSTS_URL)
+    scraper_for(browser).scroll_down(datetime(2021, 4, 1))
+    # passed the target month, although every scroll took a while to load
+    assert browser.page == 2
+
+
+def test_scroll_down_stops_at_bottom(monkeypatch):
+    monkeypatch.setattr(PublicAccountScraper, "NEW_POSTS_TIMEOUT", 0.1)
+    browser = FakeBrowser({POSTS_URL: [posts_page(6, 5), posts_page(6, 5, 4)]})
+    browser.get(POSTS_URL)
+    scraper_for(browser).scroll_down(datetime(2021, 4, 1))
+    # first scroll loads more posts, the second one does not
+    assert browser.scrolls == 4
+    assert browser.page == 1
@@ -0,0 +1,81 @@
+import csv
+
+import pytest
+
+import reconcile
+
+PARSABLE = "0 Beğen Yorum yap Paylaş"
+UNPARSABLE = "unreadable"
+
+
+@pytest.fixture
+def work_dir(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    (tmp_path / "DOM").mkdir()
+    (tmp_path / "OCR").mkdir()
+    return tmp_path
+
+
+def write_rows(path, rows):
+    with path.open(newline='', mode="w", encoding="utf-8") as f:
+        csv.writer(f).writerows(rows)
+
+
+def read_rows(path):
+    with path.open(newline='', encoding="utf-8") as f:
+        return list(csv.DictReader(f))
+
+
+def run(work_dir):
+    reconcile.reconcile(reconcile.load_stats(work_dir / "DOM"),
+                        reconcile.load_stats(work_dir / "OCR"), work_dir / "OCR")
+    return read_rows(reconcile.ACCOUNTS_CSV_PATH), read_rows(reconcile.POSTS_CSV_PATH)
+
+
+def test_reconcile(work_dir):
+    write_rows(work_dir / "DOM" / "bot_facebook_aaa.csv", [(13, 4, 5), (0, 0, 0), (7, 1, 0)])
+    write_rows(work_dir / "OCR" / "bot_facebook_aaa.csv", [(13, 4, 5), (0, 0, 0), (0, 0, 0)])
+    for order, output in enumerate([PARSABLE, PARSABLE, UNPARSABLE], start=1):
+        (work_dir / "OCR" / f"bot_facebook_202110_aaa_{order:04d}.txt").write_text(
+            output, encoding="utf-8")
+    # an account missing in OCR
+    write_rows(work_dir / "DOM" / "bot_facebook_bbb.csv", [(1, 2, 3)])
+
+    accounts, posts = run(work_dir)
+
+    assert accounts[0] == {"URL_MD5": "aaa", "DOMGonderi": "3", "OCRGonderi": "3",
+                           "Eslesen": "3", "Uyusmayan": "1", "OCRHatasi": "1",
+                           "OCRBelirsiz": "0", "BegeniFarki": "7", "YorumFarki": "1",
+                           "PaylasimFarki": "0"}
+    assert accounts[1]["DOMGonderi"] == "1" and accounts[1]["Eslesen"] == "0"
+    assert [(post["URL_MD5"], post["Sira"], post["OCRHatasi"]) for post in posts] == \
+           [("aaa", "3", "1")]
+
+
+def test_zero_rows_without_tesseract_output_are_unknown(work_dir):
+    write_rows(work_dir / "DOM" / "bot_facebook_aaa.csv", [(0, 0, 0), (3, 0, 0)])
+    write_rows(work_dir / "OCR" / "bot_facebook_aaa.csv", [(0, 0, 0), (0, 0, 0)])
+
+    accounts, posts = run(work_dir)
+
+    assert (accounts[0]["OCRHatasi"], accounts[0]["OCRBelirsiz"]) == ("0", "2")
+    assert [(post["Sira"], post["OCRHatasi"], post["OCRBelirsiz"]) for post in posts] == \
+           [("2", "0", "1")]
+
+
+def test_only_zero_rows_outputs_are_parsed(work_dir, monkeypatch):
+    write_rows(work_dir / "DOM" / "bot_facebook_aaa.csv", [(13, 4, 5), (0, 0, 0)])
+    write_rows(work_dir / "OCR" / "bot_facebook_aaa.csv", [(13, 4, 5), (0, 0, 0)])
+    for order in (1, 2):
+        (work_dir / "OCR" / f"bot_facebook_202110_aaa_{order:04d}.txt").write_text(
+            PARSABLE, encoding="utf-8")
+    read_files = []
+    read_text = reconcile.Path.read_text
+    monkeypatch.setattr(reconcile.Path, "read_text",
+                        lambda path, **kwargs: read_files.append(path.name)
+                        or read_text(path, **kwargs))
+
+    run(work_dir)
+
+    assert [name for name in read_files if name.endswith(".txt")] == \
+           ["bot_facebook_202110_aaa_0002.txt"]
@@ -0,0 +1,33 @@
+import pytest
+
+from utils import post_id_from_permalink
+
+
+@pytest.mark.parametrize("href, post_id", [
+    ("https://www.facebook.com/permalink.php?story_fbid=123&id=456", "123"),
+    ("https://www.facebook.com/besiktasbelediyesi/posts/4123?__cft__[0]=AZ", "4123"),
+    ("https://www.facebook.com/user/posts/pfbid0abcD-e", "pfbid0abcD-e"),
+    ("https://www.facebook.com/watch/?v=99", "99"),
+    ("https://www.facebook.com/photo.php?fbid=42&set=a.456&type=3", "42"),
+    ("https://www.facebook.com/photo/?fbid=999&set=a.456", "999"),
+    ("https://www.facebook.com/besiktasbelediyesi/photos/a.456/789/?type=3", "789"),
+    ("https://www.facebook.com/besiktasbelediyesi/videos/555/", "555"),
+])
+def test_post_id_from_permalink(href, post_id):
+    assert post_id_from_permalink(href) == post_id
+
+
+def test_different_photos_have_different_ids():
+    assert post_id_from_permalink("https://www.facebook.com/photo.php?fbid=1&set=a.9") != \
+           post_id_from_permalink("https://www.facebook.com/photo.php?fbid=2&set=a.9")
+
+
+@pytest.mark.parametrize("href", [
+    None,
+    "",
+    # unknown formats are not guessed, so that different posts never share an id
+    "https://www.facebook.com/photo.php?set=a.456",
+    "https://www.facebook.com/besiktasbelediyesi/",
+])
+def test_post_id_from_permalink_unknown(href):
+    assert post_id_from_permalink(href) is None